@@ -1,27 +1,30 @@
 import asyncio
 import atexit
-import hashlib
+import functools
 import hmac
-import json
+import itertools
 import logging
 import os
+import queue
 import socket
 import sqlite3
+import sys
 import threading
 import time
-import urllib.parse
-import urllib.request
-from contextlib import closing
+from contextlib import contextmanager, suppress
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, TextIO
-from urllib.parse import parse_qsl, quote
+from typing import Any, Iterator, TextIO
+from urllib.parse import quote, unquote_to_bytes
 from zoneinfo import ZoneInfo
 
-from flask import Flask, jsonify, request
-from telegram import KeyboardButton, ReplyKeyboardMarkup, Update, WebAppInfo
+import orjson
+from flask import Flask, Response, request
+from telegram import Bot, KeyboardButton, ReplyKeyboardMarkup, Update, WebAppInfo
 from telegram.error import Conflict
 from telegram.ext import Application, CommandHandler, ContextTypes
+from waitress import serve
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -31,30 +34,135 @@ DB_PATH = os.getenv("TODO_DB_PATH", str(BASE_DIR / "todo.sqlite3"))
 
 WEB_SERVER_HOST = os.getenv("WEB_SERVER_HOST", "0.0.0.0")
 WEB_SERVER_PORT = int(os.getenv("WEB_SERVER_PORT", "8080"))
+WEB_SERVER_THREADS = int(os.getenv("WEB_SERVER_THREADS", "8"))
 PUBLIC_API_BASE_URL = os.getenv("PUBLIC_API_BASE_URL", "")
 API_ALLOWED_ORIGIN = os.getenv("API_ALLOWED_ORIGIN", "https://amnyam666.github.io")
 
 MINI_APP_URL = "https://amnyam666.github.io/tgdailybot/"
 INIT_DATA_MAX_AGE_SECONDS = int(os.getenv("INIT_DATA_MAX_AGE_SECONDS", "86400"))
 MAX_TASK_LENGTH = 300
+MAX_NOTIFY_BEFORE_MINUTES = 120
+MAX_BATCH_TASKS = 100
 REMINDER_POLL_SECONDS = int(os.getenv("REMINDER_POLL_SECONDS", "20"))
+REMINDER_SEND_CONCURRENCY = 8
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_OPTIMIZE_INTERVAL_SECONDS = 3600
 
 DEFAULT_TIMEZONE = "Europe/Moscow"
-RU_TIMEZONES = {
-    "Europe/Kaliningrad",
-    "Europe/Moscow",
-    "Europe/Samara",
-    "Asia/Yekaterinburg",
-    "Asia/Omsk",
-    "Asia/Krasnoyarsk",
-    "Asia/Irkutsk",
-    "Asia/Yakutsk",
-    "Asia/Vladivostok",
-    "Asia/Magadan",
-    "Asia/Kamchatka",
+RU_TIMEZONES = frozenset(
+    sys.intern(name)
+    for name in (
+        "Europe/Kaliningrad",
+        "Europe/Moscow",
+        "Europe/Samara",
+        "Asia/Yekaterinburg",
+        "Asia/Omsk",
+        "Asia/Krasnoyarsk",
+        "Asia/Irkutsk",
+        "Asia/Yakutsk",
+        "Asia/Vladivostok",
+        "Asia/Magadan",
+        "Asia/Kamchatka",
+    )
+)
+RU_ZONEINFOS = {name: ZoneInfo(name) for name in RU_TIMEZONES | {DEFAULT_TIMEZONE}}
+
+SQL_SELECT_SETTINGS = """
+    SELECT timezone, notify_before_minutes, chat_notifications_enabled
+    FROM user_settings
+    WHERE user_id = ?
+"""
+SQL_INSERT_DEFAULT_SETTINGS = """
+    INSERT INTO user_settings (user_id, timezone, notify_before_minutes, chat_notifications_enabled)
+    VALUES (?, ?, 0, 1)
+    ON CONFLICT(user_id) DO UPDATE SET user_id = excluded.user_id
+    RETURNING timezone, notify_before_minutes, chat_notifications_enabled
+"""
+SQL_INSERT_DEFAULT_SETTINGS_IF_MISSING = """
+    INSERT OR IGNORE INTO user_settings (user_id, timezone, notify_before_minutes, chat_notifications_enabled)
+    VALUES (?, ?, 0, 1)
+"""
+SQL_UPSERT_SETTINGS = """
+    INSERT INTO user_settings (user_id, timezone, notify_before_minutes, chat_notifications_enabled)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        timezone = excluded.timezone,
+        notify_before_minutes = excluded.notify_before_minutes,
+        chat_notifications_enabled = excluded.chat_notifications_enabled
+    RETURNING timezone, notify_before_minutes, chat_notifications_enabled
+"""
+SQL_LIST_TASKS_JSON = """
+    SELECT json_group_array(
+        json_object(
+            'id', id,
+            'text', text,
+            'is_done', json(CASE WHEN is_done THEN 'true' ELSE 'false' END),
+            'reminder_at_ms', reminder_at_ms,
+            'created_at', created_at
+        )
+    )
+    FROM (
+        SELECT id, text, is_done, reminder_at_ms, created_at
+        FROM tasks
+        WHERE user_id = ?
+        ORDER BY is_done ASC, COALESCE(reminder_at_ms, 32503680000000) ASC, id ASC
+    )
+"""
+SQL_INSERT_TASK = """
+    INSERT INTO tasks (user_id, text, is_done, reminder_at_ms, notified_at_ms)
+    VALUES (?, ?, 0, ?, NULL)
+"""
+SQL_UPDATE_TASK = {
+    key: "UPDATE tasks SET "
+    + ", ".join(
+        assignment
+        for enabled, assignment in zip(
+            key,
+            ("text = ?", "is_done = ?", "reminder_at_ms = ?, notified_at_ms = NULL"),
+        )
+        if enabled
+    )
+    + " WHERE user_id = ? AND id = ?"
+    for key in itertools.product((False, True), repeat=3)
+    if any(key)
 }
-
-reminder_stop_event = threading.Event()
+SQL_DELETE_TASK = "DELETE FROM tasks WHERE user_id = ? AND id = ?"
+SQL_FIND_DUE_REMINDERS = """
+    SELECT
+        t.id,
+        t.user_id,
+        t.text,
+        t.reminder_at_ms,
+        s.timezone,
+        s.notify_before_minutes
+    FROM tasks t
+    JOIN user_settings s ON s.user_id = t.user_id
+    WHERE t.is_done = 0
+      AND t.reminder_at_ms IS NOT NULL
+      AND t.notified_at_ms IS NULL
+      AND t.reminder_at_ms <= ?
+      AND s.chat_notifications_enabled = 1
+      AND (t.reminder_at_ms - (s.notify_before_minutes * 60000)) <= ?
+    ORDER BY t.reminder_at_ms ASC
+    LIMIT 200
+"""
+SQL_NEXT_REMINDER_DUE = """
+    SELECT MIN(t.reminder_at_ms - (s.notify_before_minutes * 60000))
+    FROM tasks t
+    JOIN user_settings s ON s.user_id = t.user_id
+    WHERE t.is_done = 0
+      AND t.reminder_at_ms IS NOT NULL
+      AND t.notified_at_ms IS NULL
+      AND t.reminder_at_ms > ?
+      AND t.reminder_at_ms <= ?
+      AND s.chat_notifications_enabled = 1
+      AND (t.reminder_at_ms - (s.notify_before_minutes * 60000)) > ?
+"""
+SQL_MARK_TASK_NOTIFIED = "UPDATE tasks SET notified_at_ms = ? WHERE id = ?"
+
+db_pool: queue.Queue[sqlite3.Connection] = queue.Queue(maxsize=DB_POOL_SIZE)
+db_write_lock = threading.Lock()
+db_write_connection: sqlite3.Connection | None = None
 
 
 def ensure_event_loop() -> None:
@@ -107,14 +215,17 @@ def release_single_instance_lock(lock_file: TextIO) -> None:
 
 
 def ensure_web_server_port_available(host: str, port: int) -> None:
-    probe_host = "127.0.0.1" if host in {"0.0.0.0", "::"} else host
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        sock.settimeout(0.5)
-        if sock.connect_ex((probe_host, port)) == 0:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        if os.name != "nt":
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((host, port))
+        except OSError as exc:
             raise RuntimeError(
-                f"Порт {port} на {probe_host} уже занят. "
+                f"Порт {port} на {host} уже занят. "
                 "Остановите старый процесс или измените WEB_SERVER_PORT."
-            )
+            ) from exc
 
 
 def load_bot_token(token_file_path: str) -> str:
@@ -135,12 +246,99 @@ def load_bot_token(token_file_path: str) -> str:
     return token
 
 
-def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+def open_connection(query_only: bool = False) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        DB_PATH,
+        check_same_thread=False,
+        isolation_level=None,
+        cached_statements=256,
+    )
     conn.row_factory = sqlite3.Row
+    conn.executescript(
+        """
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-20000;
+        PRAGMA mmap_size=268435456;
+        PRAGMA busy_timeout=3000;
+        PRAGMA analysis_limit=1000;
+        """
+    )
+    if query_only:
+        conn.execute("PRAGMA query_only=ON")
     return conn
 
 
+@contextmanager
+def get_connection() -> Iterator[sqlite3.Connection]:
+    try:
+        conn = db_pool.get_nowait()
+    except queue.Empty:
+        conn = open_connection(query_only=True)
+
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            db_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+@contextmanager
+def get_write_connection() -> Iterator[sqlite3.Connection]:
+    global db_write_connection
+    with db_write_lock:
+        if db_write_connection is None:
+            db_write_connection = open_connection()
+        conn = db_write_connection
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+
+@contextmanager
+def write_transaction() -> Iterator[sqlite3.Connection]:
+    with get_write_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        conn.execute("COMMIT")
+
+
+def fill_connection_pool() -> None:
+    while not db_pool.full():
+        conn = open_connection(query_only=True)
+        try:
+            db_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+            return
+
+
+def close_connections() -> None:
+    global db_write_connection
+    while True:
+        try:
+            conn = db_pool.get_nowait()
+        except queue.Empty:
+            break
+        conn.close()
+
+    with db_write_lock:
+        if db_write_connection is not None:
+            db_write_connection.close()
+            db_write_connection = None
+
+
+def optimize_db() -> None:
+    with get_write_connection() as conn:
+        conn.execute("PRAGMA optimize=0x10002")
+
+
 def ensure_column(conn: sqlite3.Connection, table_name: str, column_name: str, definition: str) -> None:
     columns = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
     exists = any(row["name"] == column_name for row in columns)
@@ -149,7 +347,8 @@ def ensure_column(conn: sqlite3.Connection, table_name: str, column_name: str, d
 
 
 def init_db() -> None:
-    with closing(get_connection()) as conn:
+    with get_write_connection() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS tasks (
@@ -163,6 +362,18 @@ def init_db() -> None:
         )
         ensure_column(conn, "tasks", "reminder_at_ms", "INTEGER")
         ensure_column(conn, "tasks", "notified_at_ms", "INTEGER")
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks(reminder_at_ms)
+            WHERE is_done = 0 AND notified_at_ms IS NULL
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_tasks_user_sort
+            ON tasks(user_id, is_done, COALESCE(reminder_at_ms, 32503680000000), id)
+            """
+        )
 
         conn.execute(
             """
@@ -174,9 +385,12 @@ def init_db() -> None:
             )
             """
         )
-        conn.commit()
+        conn.execute("ANALYZE")
+
+    fill_connection_pool()
 
 
+@functools.lru_cache(maxsize=32)
 def validate_timezone(value: str) -> str:
     return value if value in RU_TIMEZONES else DEFAULT_TIMEZONE
 
@@ -200,18 +414,11 @@ def normalize_reminder(value: Any) -> int | None:
 
 
 def get_or_create_settings(user_id: int) -> dict[str, Any]:
-    with closing(get_connection()) as conn:
-        row = conn.execute("SELECT * FROM user_settings WHERE user_id = ?", (user_id,)).fetchone()
-        if row is None:
-            conn.execute(
-                """
-                INSERT INTO user_settings (user_id, timezone, notify_before_minutes, chat_notifications_enabled)
-                VALUES (?, ?, 0, 1)
-                """,
-                (user_id, DEFAULT_TIMEZONE),
-            )
-            conn.commit()
-            row = conn.execute("SELECT * FROM user_settings WHERE user_id = ?", (user_id,)).fetchone()
+    with get_connection() as conn:
+        row = conn.execute(SQL_SELECT_SETTINGS, (user_id,)).fetchone()
+    if row is None:
+        with get_write_connection() as conn:
+            row = conn.execute(SQL_INSERT_DEFAULT_SETTINGS, (user_id, DEFAULT_TIMEZONE)).fetchone()
 
     return {
         "timezone": validate_timezone(row["timezone"]),
@@ -227,229 +434,253 @@ def update_settings(
     chat_notifications_enabled: bool,
 ) -> dict[str, Any]:
     timezone_value = validate_timezone(timezone_value)
-    notify_before_minutes = max(0, min(120, int(notify_before_minutes)))
+    notify_before_minutes = max(0, min(MAX_NOTIFY_BEFORE_MINUTES, int(notify_before_minutes)))
     enabled_int = 1 if chat_notifications_enabled else 0
 
-    with closing(get_connection()) as conn:
-        conn.execute(
-            """
-            INSERT INTO user_settings (user_id, timezone, notify_before_minutes, chat_notifications_enabled)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(user_id) DO UPDATE SET
-                timezone = excluded.timezone,
-                notify_before_minutes = excluded.notify_before_minutes,
-                chat_notifications_enabled = excluded.chat_notifications_enabled
-            """,
+    with get_write_connection() as conn:
+        row = conn.execute(
+            SQL_UPSERT_SETTINGS,
             (user_id, timezone_value, notify_before_minutes, enabled_int),
-        )
-        conn.commit()
-    return get_or_create_settings(user_id)
+        ).fetchone()
 
+    return {
+        "timezone": validate_timezone(row["timezone"]),
+        "notify_before_minutes": int(row["notify_before_minutes"]),
+        "chat_notifications_enabled": bool(row["chat_notifications_enabled"]),
+    }
 
-def list_tasks(user_id: int) -> list[dict[str, Any]]:
-    with closing(get_connection()) as conn:
-        rows = conn.execute(
-            """
-            SELECT id, text, is_done, reminder_at_ms, created_at
-            FROM tasks
-            WHERE user_id = ?
-            ORDER BY is_done ASC, COALESCE(reminder_at_ms, 32503680000000) ASC, id ASC
-            """,
-            (user_id,),
-        ).fetchall()
+
+def list_tasks_json(user_id: int) -> str:
+    with get_connection() as conn:
+        row = conn.execute(SQL_LIST_TASKS_JSON, (user_id,)).fetchone()
+    return row[0]
+
+
+def add_tasks(user_id: int, items: list[tuple[Any, Any]]) -> list[dict[str, Any]]:
+    values = [
+        (normalize_text(text_value), normalize_reminder(reminder_value))
+        for text_value, reminder_value in items
+    ]
+
+    with write_transaction() as conn:
+        conn.execute(SQL_INSERT_DEFAULT_SETTINGS_IF_MISSING, (user_id, DEFAULT_TIMEZONE))
+        task_ids = [
+            int(conn.execute(SQL_INSERT_TASK, (user_id, text, reminder_at_ms)).lastrowid)
+            for text, reminder_at_ms in values
+        ]
 
     return [
         {
-            "id": int(row["id"]),
-            "text": row["text"],
-            "is_done": bool(row["is_done"]),
-            "reminder_at_ms": int(row["reminder_at_ms"]) if row["reminder_at_ms"] is not None else None,
-            "created_at": row["created_at"],
+            "id": task_id,
+            "text": text,
+            "is_done": False,
+            "reminder_at_ms": reminder_at_ms,
         }
-        for row in rows
+        for task_id, (text, reminder_at_ms) in zip(task_ids, values)
     ]
 
 
 def add_task(user_id: int, text_value: Any, reminder_value: Any) -> dict[str, Any]:
-    get_or_create_settings(user_id)
-    text = normalize_text(text_value)
-    reminder_at_ms = normalize_reminder(reminder_value)
-
-    with closing(get_connection()) as conn:
-        cursor = conn.execute(
-            """
-            INSERT INTO tasks (user_id, text, is_done, reminder_at_ms, notified_at_ms)
-            VALUES (?, ?, 0, ?, NULL)
-            """,
-            (user_id, text, reminder_at_ms),
-        )
-        conn.commit()
-        task_id = int(cursor.lastrowid)
-
-    return {
-        "id": task_id,
-        "text": text,
-        "is_done": False,
-        "reminder_at_ms": reminder_at_ms,
-    }
+    return add_tasks(user_id, [(text_value, reminder_value)])[0]
 
 
 def update_task(user_id: int, task_id: int, payload: dict[str, Any]) -> bool:
-    updates: list[str] = []
-    params: list[Any] = []
+    has_text = "text" in payload
+    has_done = "is_done" in payload
+    has_reminder = "reminder_at_ms" in payload
+    if not (has_text or has_done or has_reminder):
+        return False
 
-    if "text" in payload:
-        updates.append("text = ?")
+    params: list[Any] = []
+    if has_text:
         params.append(normalize_text(payload["text"]))
-
-    if "is_done" in payload:
-        updates.append("is_done = ?")
+    if has_done:
         params.append(1 if bool(payload["is_done"]) else 0)
-
-    if "reminder_at_ms" in payload:
-        reminder_at_ms = normalize_reminder(payload["reminder_at_ms"])
-        updates.append("reminder_at_ms = ?")
-        params.append(reminder_at_ms)
-        updates.append("notified_at_ms = NULL")
-
-    if not updates:
-        return False
-
+    if has_reminder:
+        params.append(normalize_reminder(payload["reminder_at_ms"]))
     params.extend([user_id, task_id])
-    query = f"UPDATE tasks SET {', '.join(updates)} WHERE user_id = ? AND id = ?"
 
-    with closing(get_connection()) as conn:
-        cursor = conn.execute(query, params)
-        conn.commit()
+    with get_write_connection() as conn:
+        cursor = conn.execute(SQL_UPDATE_TASK[(has_text, has_done, has_reminder)], params)
         return cursor.rowcount > 0
 
 
 def delete_task(user_id: int, task_id: int) -> bool:
-    with closing(get_connection()) as conn:
-        cursor = conn.execute("DELETE FROM tasks WHERE user_id = ? AND id = ?", (user_id, task_id))
-        conn.commit()
+    with get_write_connection() as conn:
+        cursor = conn.execute(SQL_DELETE_TASK, (user_id, task_id))
         return cursor.rowcount > 0
 
 
-def validate_telegram_init_data(init_data: str, bot_token: str) -> dict[str, Any]:
+def unquote_init_data_value(value: bytes) -> bytes:
+    if b"%" in value or b"+" in value:
+        return unquote_to_bytes(value.replace(b"+", b" "))
+    return value
+
+
+def parse_init_data(init_data: bytes) -> Iterator[tuple[bytes, bytes]]:
+    for part in init_data.split(b"&"):
+        if not part:
+            continue
+        key, _, value = part.partition(b"=")
+        yield unquote_init_data_value(key), unquote_init_data_value(value)
+
+
+def webapp_secret_key(bot_token: str) -> bytes:
+    return hmac.digest(b"WebAppData", bot_token.encode("utf-8"), "sha256")
+
+
+def validate_telegram_init_data(init_data: str, secret_key: bytes) -> dict[str, Any]:
     if not init_data:
         raise ValueError("Отсутствует Telegram initData.")
 
-    parsed = dict(parse_qsl(init_data, keep_blank_values=True))
-    received_hash = parsed.pop("hash", None)
+    received_hash = auth_date_raw = user_json = None
+    check_items: list[tuple[bytes, bytes]] = []
+    for key, value in parse_init_data(init_data.encode("utf-8")):
+        if key == b"hash":
+            received_hash = value
+            continue
+        if key == b"auth_date":
+            auth_date_raw = value
+        elif key == b"user":
+            user_json = value
+        check_items.append((key, value))
+
     if not received_hash:
         raise ValueError("Некорректный Telegram initData: отсутствует hash.")
 
-    data_check_string = "\n".join(f"{key}={value}" for key, value in sorted(parsed.items()))
-    secret_key = hmac.new(
-        key=b"WebAppData",
-        msg=bot_token.encode("utf-8"),
-        digestmod=hashlib.sha256,
-    ).digest()
-    computed_hash = hmac.new(
-        key=secret_key,
-        msg=data_check_string.encode("utf-8"),
-        digestmod=hashlib.sha256,
-    ).hexdigest()
-
-    if not hmac.compare_digest(received_hash, computed_hash):
+    check_items.sort(key=itemgetter(0))
+    data_check_string = b"\n".join(key + b"=" + value for key, value in check_items)
+    try:
+        received_digest = bytes.fromhex(received_hash.decode("ascii"))
+    except ValueError as exc:
+        raise ValueError("Некорректная подпись Telegram initData.") from exc
+
+    computed_digest = hmac.digest(secret_key, data_check_string, "sha256")
+    if not hmac.compare_digest(received_digest, computed_digest):
         raise ValueError("Некорректная подпись Telegram initData.")
 
-    auth_date_raw = parsed.get("auth_date")
     if not auth_date_raw or not auth_date_raw.isdigit():
         raise ValueError("Некорректный Telegram initData: неверный auth_date.")
     auth_date = int(auth_date_raw)
     if int(time.time()) - auth_date > INIT_DATA_MAX_AGE_SECONDS:
         raise ValueError("Сессия Telegram истекла. Откройте мини-приложение заново.")
 
-    user_json = parsed.get("user")
     if not user_json:
         raise ValueError("Некорректный Telegram initData: пользователь не найден.")
 
-    user = json.loads(user_json)
+    user = orjson.loads(user_json)
     return {"user_id": int(user["id"]), "user": user}
 
 
 def format_datetime_for_timezone(timestamp_ms: int, timezone_name: str) -> str:
-    zone_name = validate_timezone(timezone_name)
-    dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).astimezone(ZoneInfo(zone_name))
+    zone = RU_ZONEINFOS[validate_timezone(timezone_name)]
+    dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).astimezone(zone)
     return dt.strftime("%d.%m.%Y %H:%M")
 
 
-def send_telegram_message(token: str, chat_id: int, text: str) -> bool:
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    payload = urllib.parse.urlencode({"chat_id": str(chat_id), "text": text}).encode("utf-8")
-    req = urllib.request.Request(url, data=payload, method="POST")
-
-    try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            body = response.read().decode("utf-8")
-            data = json.loads(body)
-            return bool(data.get("ok"))
-    except Exception as exc:  # noqa: BLE001
-        logging.error("Ошибка отправки Telegram-сообщения user_id=%s: %s", chat_id, exc)
-        return False
-
-
-def find_due_reminders(now_ms: int) -> list[sqlite3.Row]:
-    with closing(get_connection()) as conn:
+def find_due_reminders(now_ms: int) -> tuple[list[sqlite3.Row], int | None]:
+    with get_connection() as conn:
         rows = conn.execute(
-            """
-            SELECT
-                t.id,
-                t.user_id,
-                t.text,
-                t.reminder_at_ms,
-                s.timezone,
-                s.notify_before_minutes
-            FROM tasks t
-            JOIN user_settings s ON s.user_id = t.user_id
-            WHERE t.is_done = 0
-              AND t.reminder_at_ms IS NOT NULL
-              AND t.notified_at_ms IS NULL
-              AND s.chat_notifications_enabled = 1
-              AND (t.reminder_at_ms - (s.notify_before_minutes * 60000)) <= ?
-            ORDER BY t.reminder_at_ms ASC
-            LIMIT 200
-            """,
-            (now_ms,),
+            SQL_FIND_DUE_REMINDERS,
+            (now_ms + MAX_NOTIFY_BEFORE_MINUTES * 60000, now_ms),
         ).fetchall()
-    return rows
+        next_row = conn.execute(
+            SQL_NEXT_REMINDER_DUE,
+            (
+                now_ms,
+                now_ms + (REMINDER_POLL_SECONDS + MAX_NOTIFY_BEFORE_MINUTES * 60) * 1000,
+                now_ms,
+            ),
+        ).fetchone()
+    return rows, next_row[0]
+
+
+def mark_tasks_notified(task_ids: list[int], notified_at_ms: int) -> None:
+    if not task_ids:
+        return
+    with write_transaction() as conn:
+        conn.executemany(
+            SQL_MARK_TASK_NOTIFIED,
+            [(notified_at_ms, task_id) for task_id in task_ids],
+        )
 
 
-def mark_task_notified(task_id: int, notified_at_ms: int) -> None:
-    with closing(get_connection()) as conn:
-        conn.execute("UPDATE tasks SET notified_at_ms = ? WHERE id = ?", (notified_at_ms, task_id))
-        conn.commit()
+def build_reminder_message(row: sqlite3.Row) -> str:
+    timezone_name = validate_timezone(row["timezone"])
+    date_text = format_datetime_for_timezone(int(row["reminder_at_ms"]), timezone_name)
+    return (
+        "Напоминание о задаче\n\n"
+        f"Задача: {row['text']}\n"
+        f"Дата: {date_text} ({timezone_name})"
+    )
 
 
-def reminder_worker(token: str) -> None:
-    while not reminder_stop_event.is_set():
-        now_ms = int(time.time() * 1000)
-        rows = find_due_reminders(now_ms)
+async def send_reminder(bot: Bot, row: sqlite3.Row, semaphore: asyncio.Semaphore) -> bool:
+    try:
+        async with semaphore:
+            await bot.send_message(chat_id=int(row["user_id"]), text=build_reminder_message(row))
+    except Exception as exc:  # noqa: BLE001
+        logging.error("Ошибка отправки Telegram-сообщения user_id=%s: %s", row["user_id"], exc)
+        return False
+    return True
 
-        for row in rows:
-            reminder_at_ms = int(row["reminder_at_ms"])
-            timezone_name = validate_timezone(row["timezone"])
-            date_text = format_datetime_for_timezone(reminder_at_ms, timezone_name)
-            message = (
-                "Напоминание о задаче\n\n"
-                f"Задача: {row['text']}\n"
-                f"Дата: {date_text} ({timezone_name})"
-            )
 
-            sent = send_telegram_message(token, int(row["user_id"]), message)
-            if sent:
-                mark_task_notified(int(row["id"]), now_ms)
+async def reminder_worker(bot: Bot) -> None:
+    semaphore = asyncio.Semaphore(REMINDER_SEND_CONCURRENCY)
+    poll_seconds = max(5, REMINDER_POLL_SECONDS)
+    next_optimize_at = time.monotonic() + DB_OPTIMIZE_INTERVAL_SECONDS
+    while True:
+        next_due_ms = None
+        try:
+            now_ms = int(time.time() * 1000)
+            rows, next_due_ms = await asyncio.to_thread(find_due_reminders, now_ms)
+            results = await asyncio.gather(*(send_reminder(bot, row, semaphore) for row in rows))
+            notified_ids = [int(row["id"]) for row, sent in zip(rows, results) if sent]
+            await asyncio.to_thread(mark_tasks_notified, notified_ids, now_ms)
+
+            if time.monotonic() >= next_optimize_at:
+                next_optimize_at = time.monotonic() + DB_OPTIMIZE_INTERVAL_SECONDS
+                await asyncio.to_thread(optimize_db)
+        except Exception:  # noqa: BLE001
+            logging.exception("Ошибка в сервисе напоминаний")
+
+        sleep_for = poll_seconds
+        if next_due_ms is not None:
+            sleep_for = max(1.0, min(poll_seconds, (next_due_ms - time.time() * 1000) / 1000))
+        await asyncio.sleep(sleep_for)
+
+
+async def start_reminder_worker(application: Application) -> None:
+    application.bot_data["reminder_task"] = asyncio.create_task(reminder_worker(application.bot))
+    logging.info("Сервис напоминаний запущен")
 
-        reminder_stop_event.wait(max(5, REMINDER_POLL_SECONDS))
+
+async def stop_reminder_worker(application: Application) -> None:
+    task = application.bot_data.pop("reminder_task", None)
+    if task is None:
+        return
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
 
 
 def create_web_server(token: str) -> Flask:
     app = Flask(__name__)
+    secret_key = webapp_secret_key(token)
+
+    def json_response(payload: Any, status: int = 200) -> Response:
+        return Response(orjson.dumps(payload), status=status, mimetype="application/json")
+
+    def read_json_body() -> Any:
+        if not request.is_json:
+            return None
+        try:
+            return orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return None
 
     def api_error(message: str, status: int):
-        return jsonify({"ok": False, "error": message}), status
+        return json_response({"ok": False, "error": message}, status)
 
     def resolve_origin_header() -> str:
         if API_ALLOWED_ORIGIN == "*":
@@ -472,11 +703,11 @@ def create_web_server(token: str) -> Flask:
 
     def get_auth_payload() -> dict[str, Any]:
         init_data = request.headers.get("X-Telegram-Init-Data", "").strip()
-        return validate_telegram_init_data(init_data, token)
+        return validate_telegram_init_data(init_data, secret_key)
 
     @app.get("/api/health")
     def api_health():
-        return jsonify({"ok": True})
+        return json_response({"ok": True})
 
     @app.get("/api/profile")
     def api_profile():
@@ -484,7 +715,7 @@ def create_web_server(token: str) -> Flask:
             payload = get_auth_payload()
         except ValueError as exc:
             return api_error(str(exc), 401)
-        return jsonify({"ok": True, "user": payload["user"]})
+        return json_response({"ok": True, "user": payload["user"]})
 
     @app.get("/api/settings")
     def api_get_settings():
@@ -493,7 +724,7 @@ def create_web_server(token: str) -> Flask:
         except ValueError as exc:
             return api_error(str(exc), 401)
         settings = get_or_create_settings(int(payload["user_id"]))
-        return jsonify({"ok": True, "settings": settings})
+        return json_response({"ok": True, "settings": settings})
 
     @app.put("/api/settings")
     def api_put_settings():
@@ -502,9 +733,9 @@ def create_web_server(token: str) -> Flask:
         except ValueError as exc:
             return api_error(str(exc), 401)
 
-        body = request.get_json(silent=True) or {}
+        body = read_json_body() or {}
         timezone_value = validate_timezone(str(body.get("timezone", DEFAULT_TIMEZONE)))
-        notify_before_minutes = clamp_int(body.get("notify_before_minutes"), 0, 120, 0)
+        notify_before_minutes = clamp_int(body.get("notify_before_minutes"), 0, MAX_NOTIFY_BEFORE_MINUTES, 0)
         chat_notifications_enabled = bool(body.get("chat_notifications_enabled", True))
 
         settings = update_settings(
@@ -513,7 +744,7 @@ def create_web_server(token: str) -> Flask:
             notify_before_minutes,
             chat_notifications_enabled,
         )
-        return jsonify({"ok": True, "settings": settings})
+        return json_response({"ok": True, "settings": settings})
 
     @app.get("/api/tasks")
     def api_get_tasks():
@@ -521,8 +752,8 @@ def create_web_server(token: str) -> Flask:
             payload = get_auth_payload()
         except ValueError as exc:
             return api_error(str(exc), 401)
-        tasks = list_tasks(int(payload["user_id"]))
-        return jsonify({"ok": True, "tasks": tasks})
+        tasks_json = list_tasks_json(int(payload["user_id"]))
+        return Response('{"ok":true,"tasks":' + tasks_json + "}", mimetype="application/json")
 
     @app.post("/api/tasks")
     def api_post_tasks():
@@ -531,7 +762,7 @@ def create_web_server(token: str) -> Flask:
         except ValueError as exc:
             return api_error(str(exc), 401)
 
-        body = request.get_json(silent=True) or {}
+        body = read_json_body() or {}
         try:
             task = add_task(
                 int(payload["user_id"]),
@@ -540,7 +771,29 @@ def create_web_server(token: str) -> Flask:
             )
         except ValueError as exc:
             return api_error(str(exc), 400)
-        return jsonify({"ok": True, "task": task}), 201
+        return json_response({"ok": True, "task": task}, 201)
+
+    @app.post("/api/tasks/batch")
+    def api_post_tasks_batch():
+        try:
+            payload = get_auth_payload()
+        except ValueError as exc:
+            return api_error(str(exc), 401)
+
+        body = read_json_body()
+        if not isinstance(body, list) or not body or not all(isinstance(item, dict) for item in body):
+            return api_error("Ожидается непустой список задач.", 400)
+        if len(body) > MAX_BATCH_TASKS:
+            return api_error(f"Слишком много задач в одном запросе. Максимум {MAX_BATCH_TASKS}.", 400)
+
+        try:
+            tasks = add_tasks(
+                int(payload["user_id"]),
+                [(item.get("text", ""), item.get("reminder_at_ms")) for item in body],
+            )
+        except ValueError as exc:
+            return api_error(str(exc), 400)
+        return json_response({"ok": True, "tasks": tasks}, 201)
 
     @app.patch("/api/tasks/<int:task_id>")
     def api_patch_task(task_id: int):
@@ -549,7 +802,7 @@ def create_web_server(token: str) -> Flask:
         except ValueError as exc:
             return api_error(str(exc), 401)
 
-        body = request.get_json(silent=True) or {}
+        body = read_json_body() or {}
         try:
             updated = update_task(int(payload["user_id"]), task_id, body)
         except ValueError as exc:
@@ -557,7 +810,7 @@ def create_web_server(token: str) -> Flask:
 
         if not updated:
             return api_error("Задача не найдена или данные не изменены.", 404)
-        return jsonify({"ok": True})
+        return json_response({"ok": True})
 
     @app.delete("/api/tasks/<int:task_id>")
     def api_delete_task(task_id: int):
@@ -569,7 +822,7 @@ def create_web_server(token: str) -> Flask:
         deleted = delete_task(int(payload["user_id"]), task_id)
         if not deleted:
             return api_error("Задача не найдена.", 404)
-        return jsonify({"ok": True})
+        return json_response({"ok": True})
 
     return app
 
@@ -583,7 +836,7 @@ def clamp_int(value: Any, minimum: int, maximum: int, fallback: int) -> int:
 
 
 def run_web_server(app: Flask) -> None:
-    app.run(host=WEB_SERVER_HOST, port=WEB_SERVER_PORT, debug=False, use_reloader=False)
+    serve(app, host=WEB_SERVER_HOST, port=WEB_SERVER_PORT, threads=WEB_SERVER_THREADS)
 
 
 def build_mini_app_url() -> str:
@@ -638,6 +891,8 @@ def main() -> None:
     )
 
     init_db()
+    atexit.register(close_connections)
+    atexit.register(optimize_db)
     ensure_web_server_port_available(WEB_SERVER_HOST, WEB_SERVER_PORT)
 
     web_server = create_web_server(token)
@@ -645,12 +900,15 @@ def main() -> None:
     web_thread.start()
     logging.info("API запущен: http://%s:%s", WEB_SERVER_HOST, WEB_SERVER_PORT)
 
-    reminder_thread = threading.Thread(target=reminder_worker, args=(token,), daemon=True)
-    reminder_thread.start()
-    logging.info("Сервис напоминаний запущен")
-
     ensure_event_loop()
-    app = Application.builder().token(token).build()
+    app = (
+        Application.builder()
+        .token(token)
+        .http_version("2")
+        .post_init(start_reminder_worker)
+        .post_stop(stop_reminder_worker)
+        .build()
+    )
     app.add_handler(CommandHandler("start", start_command))
     app.add_handler(CommandHandler("app", app_command))
     app.add_handler(CommandHandler("help", help_command))
@@ -661,8 +919,6 @@ def main() -> None:
         raise RuntimeError(
             "Telegram вернул 409 Conflict: этот токен уже используется в другом процессе."
         ) from exc
-    finally:
-        reminder_stop_event.set()
 
 
 if __name__ == "__main__":